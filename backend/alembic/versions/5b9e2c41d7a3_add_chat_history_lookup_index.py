@@ -0,0 +1,32 @@
+"""add chat history lookup index
+
+Revision ID: 5b9e2c41d7a3
+Revises: 714218c3c340
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e2c41d7a3'
+down_revision: Union[str, Sequence[str], None] = '714218c3c340'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_chat_history_user_model_created',
+        'chat_history',
+        ['user_id', 'model_name', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_history_user_model_created', table_name='chat_history')
@@ -2,11 +2,12 @@ import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI  
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware  
-from redis.asyncio import Redis
 from fastapi_limiter import FastAPILimiter
 
 from src.core.config import settings
+from src.core import cache, recaptcha, history_writer
 from src.api import (
     auth, chat, ws
 )
@@ -16,24 +17,30 @@ from src.api import (
 async def lifespan(app: FastAPI):   # means the whole lifespan of my app from start to finish
     print("Startup ready.")   # happens at startup
 
-    redis_connection = Redis.from_url(
-        settings.REDIS_URL,
-        encoding="utf-8",
-        decode_responses=True
-    )
+    # one Redis connection shared by the rate limiter and the cache
+    redis_connection = cache.init_redis(settings.REDIS_URL)
+    await cache.load_scripts()
 
     await FastAPILimiter.init(redis_connection)
 
+    recaptcha.init_http_client()
+
+    history_writer.start_writer()
+
     yield     # app is running here normally (requests)
 
+    await history_writer.close_writer()
+    await recaptcha.close_http_client()
     await FastAPILimiter.close()
+    cache.close_redis()
     print("Shutdown...")  # happens at shutdown
 
 
 
 app = FastAPI(
     title="FastAPI Gemini Ai App",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
@@ -3,5 +3,5 @@ from abc import ABC, abstractmethod
 
 class AIPlatform(ABC):
     @abstractmethod
-    def chat(self, prompt: str) -> str:
+    async def chat(self, prompt: str) -> str:
         pass
\ No newline at end of file
@@ -8,11 +8,11 @@ class Gemini(AIPlatform):
         self.client = genai.Client(api_key=api_key)
 
 
-    def chat(self, prompt: str) -> str:
+    async def chat(self, prompt: str) -> str:
         if self.system_prompt:
             prompt = f"{self.system_prompt}\n\n{prompt}"
 
-        response = self.client.models.generate_content(
+        response = await self.client.aio.models.generate_content(
             model=self.model,
             contents=prompt,
         )
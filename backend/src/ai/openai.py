@@ -1,5 +1,5 @@
 from fastapi import HTTPException, status
-from openai import OpenAI as open_ai
+from openai import AsyncOpenAI as open_ai
 from .base import AIPlatform
 
 
@@ -12,11 +12,11 @@ class OpenAI(AIPlatform):
         )
 
 
-    def chat(self, prompt: str) -> str:
+    async def chat(self, prompt: str) -> str:
         if self.system_prompt:
             prompt = f"{self.system_prompt}\n\n{prompt}"
 
-        response = self.client.responses.create(
+        response = await self.client.responses.create(
                 model=self.model,
                 input=prompt
             )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core.database import get_db
 from src.core.config import settings
@@ -15,7 +15,7 @@ router = APIRouter(
 
 
 @router.post('/register', response_model=AfterSignUpSchema, status_code=status.HTTP_201_CREATED)
-async def sign_up(data: SignUpSchema, db: Session = Depends(get_db)):
+async def sign_up(data: SignUpSchema, db: AsyncSession = Depends(get_db)):
     user = await auth_repository.signup(data, db)
     return {
         "user": user,
@@ -24,6 +24,6 @@ async def sign_up(data: SignUpSchema, db: Session = Depends(get_db)):
 
 
 @router.post('/login', response_model=AfterLoginSchema, status_code=status.HTTP_200_OK)
-async def login(schema: LoginSchema, db: Session = Depends(get_db)):
+async def login(schema: LoginSchema, db: AsyncSession = Depends(get_db)):
     user, access_token = await auth_repository.login(schema, db)
     return {"user": UserReadSchema.model_validate(user), "access_token": access_token, "token_type": "bearer"}
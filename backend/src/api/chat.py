@@ -1,8 +1,12 @@
+import time
+
+import orjson
 from fastapi import (
-    APIRouter, Depends, WebSocket, WebSocketDisconnect, status, HTTPException
+    APIRouter, Depends, WebSocket, WebSocketDisconnect, status
 )
-from sqlmodel import Session
-from fastapi_limiter.depends import WebSocketRateLimiter
+from sqlalchemy import inspect
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi.responses import ORJSONResponse
 
 from src.models.user import User
 from src.core.oauth2 import get_current_user
@@ -11,7 +15,9 @@ from src.core.enums import AIModels, PROVIDER_AVAILABILITY
 from src.core import database
 from src.core.oauth2 import authenticate_websocket
 from src.core.config import settings
-from src.core.helpers import get_user_from_token, parse_ws_message, process_ai_request
+from src.core.helpers import receive_ws_message, parse_ws_message, process_ai_request
+from src.core.cache import get_cached_user, load_user, per_message_redis
+from src.core.batched_sender import BatchedSender
 from src.schemas.chat_schema import (
     ChatRequest, ChatResponse, GetPlatforms, ChatHistoryResponse, UsageInfo
 )
@@ -21,26 +27,35 @@ router = APIRouter(
     prefix="/ai", tags=["Ai"]
 )
 
-# Create rate limiter ONCE at module level to be shared across all connections
-ratelimit = WebSocketRateLimiter(
-    times=settings.RATE_LIMIT_TIMES,
-    seconds=settings.RATE_LIMIT_WINDOW
-)
+# Fixed for the process lifetime; bound once instead of looked up on settings per message
+AI_USAGE_LIMIT = settings.AI_USAGE_LIMIT
+RATE_LIMIT_WINDOW = settings.RATE_LIMIT_WINDOW
+USER_CACHE_TTL = settings.USER_CACHE_TTL
+
+# Sent on every message dropped by the rate limit, so encode it once
+_RATE_LIMIT_ERROR = orjson.dumps({
+    "error": f"You have exceeded the rate limit. Please try again after {RATE_LIMIT_WINDOW} seconds.",
+})
+
+# Both responses only depend on constants, so build them once at import time
+_PLATFORMS_RESPONSE = {"platforms": [model.value for model in AIModels]}
+_AVAILABILITY_RESPONSE = {
+    "availability": {
+        model.value: PROVIDER_AVAILABILITY.get(model, False)
+        for model in AIModels
+    }
+}
 
 
+# Returning the response directly skips response_model re-validation (the model stays for the docs)
 @router.get('/platforms', response_model=GetPlatforms)
 def get_platforms():
-    return {"platforms": [model.value for model in AIModels]}
+    return ORJSONResponse(_PLATFORMS_RESPONSE)
 
 
 @router.get('/provider-availability')
 def get_provider_availability():
-    return {
-        "availability": {
-            model.value: PROVIDER_AVAILABILITY.get(model, False)
-            for model in AIModels
-        }
-    }
+    return ORJSONResponse(_AVAILABILITY_RESPONSE)
 
 
 @router.websocket("/ws/chat")
@@ -51,68 +66,81 @@ async def websocket_endpoint(websocket: WebSocket):
     if not token_data:
         return
 
-    with Session(database.engine) as db:
-        user = get_user_from_token(db, token_data.email)
-        if user is None:
+    # One session for the socket lifetime; it only holds a pool connection while a transaction is open
+    async with database.AsyncSessionLocal() as db:
+        current_user = await get_cached_user(db, token_data.email)
+        if current_user is None:
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
-        user_id = user.id
+        user_id = current_user.id
+        await db.commit()  # hand the connection back while waiting for messages
 
-    try:
-        while True:
-            raw_data = await websocket.receive_json()
+        # Reuse the user loaded at connect time; only re-fetch once it is older than USER_CACHE_TTL
+        user_loaded_at = time.monotonic()
 
-            data = await parse_ws_message(websocket, raw_data)
-            if not data:
-                continue
+        # All outgoing payloads (including errors from helpers/repository) go through one batching sender
+        sender = BatchedSender(websocket)
 
-            try:
-                await ratelimit(websocket, context_key=f"user:{user_id}")
-            except HTTPException:
-                error_payload = {
-                    "error": f"You have exceeded the rate limit. Please try again after {settings.RATE_LIMIT_WINDOW} seconds.",
-                }
-                await websocket.send_json(error_payload)
-                continue
-
-            # Create new session for each message to get fresh user state
-            with Session(database.engine) as db:
-                # Fetch user fresh from database for each request
-                current_user = get_user_from_token(db, token_data.email)
-                if current_user is None:
-                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-                    break
-
-                chat_record, remaining_requests = await process_ai_request(websocket, data, current_user, db)
-                if not chat_record:
+        try:
+            while True:
+                raw_data = await receive_ws_message(websocket)
+
+                data = await parse_ws_message(sender, raw_data)
+                if not data:
                     continue
 
-                # Refresh user to get updated ai_requests_count after increment
-                db.refresh(current_user)
+                # Rate-limit hit and cached identity share one Redis round trip
+                allowed, cached_user = await per_message_redis(user_id, token_data.email)
+                if not allowed:
+                    sender.enqueue(_RATE_LIMIT_ERROR)
+                    continue
+
+                # A repository rollback expires the user, so re-fetch it then as well
+                if inspect(current_user).expired or time.monotonic() - user_loaded_at > USER_CACHE_TTL:
+                    db.expunge(current_user)
+                    current_user = await load_user(db, token_data.email, cached_user)
+                    if current_user is None:
+                        await sender.close()
+                        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                        break
+                    user_loaded_at = time.monotonic()
+
+                # generate_model_response already returns the post-increment remaining count
+                chat_record, remaining_requests = await process_ai_request(sender, data, current_user, db)
+
+                # Close the transaction (no-op after the repository's own commit) so the next message starts fresh
+                await db.commit()
+
+                if not chat_record:
+                    continue
 
                 payload = {
                     "prompt": chat_record.prompt,
                     "response": chat_record.response,
                     "created_at": chat_record.created_at.isoformat(),
                     "model_name": chat_record.model_name.value,
-                    "remaining_requests": remaining_requests if remaining_requests is not None else (max(0, settings.AI_USAGE_LIMIT - current_user.ai_requests_count) if not current_user.is_unlimited else -1)
+                    "remaining_requests": remaining_requests
                 }
-                await websocket.send_json(payload)
+                sender.enqueue(payload)
 
-    except WebSocketDisconnect:
-        print("Client disconnected")
+        except WebSocketDisconnect:
+            print("Client disconnected")
 
-    except Exception as e:
-        try:
-            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
-        except RuntimeError:
-            pass
-        print("Error:", e)
+        except Exception as e:
+            await sender.close()
+            try:
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            except RuntimeError:
+                pass
+            print("Error:", e)
+
+        finally:
+            await sender.close()
 
 
 @router.get('/chat-history', response_model=ChatHistoryResponse)
-def get_chat_history(model_name: AIModels, current_user: User = Depends(get_current_user), db: Session = Depends(database.get_db)):
-    chat_records = chat_repository.get_chat_history(
+async def get_chat_history(model_name: AIModels, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(database.get_db)):
+    chat_records = await chat_repository.get_chat_history(
         model_name, current_user, db)
 
     # Calculate remaining requests
@@ -120,11 +148,11 @@ def get_chat_history(model_name: AIModels, current_user: User = Depends(get_curr
         remaining_requests = -1
     else:
         remaining_requests = max(
-            0, settings.AI_USAGE_LIMIT - current_user.ai_requests_count)
+            0, AI_USAGE_LIMIT - current_user.ai_requests_count)
 
     usage_info = UsageInfo(
         remaining_requests=remaining_requests,
-        limit=settings.AI_USAGE_LIMIT
+        limit=AI_USAGE_LIMIT
     )
 
     return ChatHistoryResponse(chat=chat_records, usage_info=usage_info)
@@ -132,7 +160,7 @@ def get_chat_history(model_name: AIModels, current_user: User = Depends(get_curr
 
 # old non-real-time chat code
 @router.post('/chat', response_model=ChatResponse)
-def chat(data: ChatRequest, current_user: User = Depends(get_current_user), db: Session = Depends(database.get_db)):
-    response_text, remaining_requests = chat_repository.chat(
+async def chat(data: ChatRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(database.get_db)):
+    response_text, remaining_requests = await chat_repository.chat(
         data, current_user, db)
     return ChatResponse(response=response_text, remaining_requests=remaining_requests)
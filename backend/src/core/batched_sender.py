@@ -0,0 +1,78 @@
+import asyncio
+
+import orjson
+from fastapi import WebSocket
+
+
+_CLOSE = object()  # queue sentinel: flush what is pending, then stop
+
+
+class BatchedSender:
+    """
+    Coalesces outgoing WebSocket payloads so each flush is a single frame.
+
+    Payloads queued within the same event-loop tick (or within `max_delay`
+    seconds) are written together: one payload goes out as a plain JSON
+    object, several as a JSON array. `max_bytes` bounds the size of a single
+    frame; a batch that would exceed it is split across frames.
+
+    A payload may also be `bytes` holding an already-encoded JSON object
+    (e.g. a precomputed error), which is written as-is.
+    """
+
+    def __init__(self, websocket: WebSocket, max_batch: int = 128, max_delay: float = 0, max_bytes: int = 64 * 1024):
+        self.websocket = websocket
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, payload: dict | bytes):
+        self._queue.put_nowait(payload)
+
+    # Same signature as WebSocket.send_json so the sender can be passed wherever a websocket is expected
+    async def send_json(self, payload: dict | bytes):
+        self.enqueue(payload)
+
+    async def close(self):
+        """Flush pending payloads and stop the background task."""
+        if not self._task.done():
+            self._queue.put_nowait(_CLOSE)
+        # a send error (e.g. client already gone) has nowhere to go at this point
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        closing = False
+        while not closing:
+            batch = [await self._queue.get()]
+
+            # let the rest of this tick (or the delay window) queue more payloads
+            await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if _CLOSE in batch:
+                closing = True
+                batch = [payload for payload in batch if payload is not _CLOSE]
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[dict | bytes]):
+        frame, size = [], 0
+        for payload in batch:
+            # default=str: an unexpected type must not kill the sender task
+            encoded = payload if isinstance(payload, bytes) else orjson.dumps(payload, default=str)
+            if frame and size + len(encoded) > self.max_bytes:
+                await self._send(frame)
+                frame, size = [], 0
+            frame.append(encoded)
+            size += len(encoded) + 1  # +1 for the separating comma
+
+        if frame:
+            await self._send(frame)
+
+    async def _send(self, frame: list[bytes]):
+        data = frame[0] if len(frame) == 1 else b"[" + b",".join(frame) + b"]"
+        # Text frames keep the protocol readable by browser clients without a binaryType switch
+        await self.websocket.send_text(data.decode())
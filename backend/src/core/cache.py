@@ -0,0 +1,146 @@
+import json
+from datetime import datetime
+
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError, RedisError
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.config import settings
+from src.core.helpers import get_user_from_token
+from src.models.user import User
+
+
+# Shared connection, created in main.lifespan. None means caching is disabled.
+redis_client: Redis | None = None
+
+USER_CACHE_PREFIX = "auth:user:"
+# Everything the chat path needs; the password hash never goes to Redis
+USER_CACHE_FIELDS = ("id", "name", "username", "email", "ai_requests_count",
+                     "is_unlimited", "created_at", "updated_at")
+
+RATE_LIMIT_PREFIX = "rl:"
+# Fixed-window limiter evaluated inside Redis: KEYS[1] = counter, ARGV = (times, window seconds).
+# Returns {allowed (1/0), remaining}
+RATE_LIMIT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local limit = tonumber(ARGV[1])
+return {count <= limit and 1 or 0, math.max(limit - count, 0)}
+"""
+# SHA of the loaded script, set by load_scripts()
+rate_limit_sha: str | None = None
+
+# Fixed for the process lifetime; bound once instead of looked up on settings per message
+USER_CACHE_TTL = settings.USER_CACHE_TTL
+RATE_LIMIT_TIMES = settings.RATE_LIMIT_TIMES
+RATE_LIMIT_WINDOW = settings.RATE_LIMIT_WINDOW
+
+
+def init_redis(redis_url: str) -> Redis:
+    global redis_client
+    redis_client = Redis.from_url(
+        redis_url,
+        encoding="utf-8",
+        decode_responses=True
+    )
+    return redis_client
+
+
+async def load_scripts():
+    """Register the Lua scripts once (lifespan, or again after Redis has dropped them)."""
+    global rate_limit_sha
+    if redis_client is None:
+        return
+    try:
+        rate_limit_sha = await redis_client.script_load(RATE_LIMIT_SCRIPT)
+    except RedisError:
+        rate_limit_sha = None
+
+
+def close_redis():
+    # The connection itself is closed by FastAPILimiter.close()
+    global redis_client
+    redis_client = None
+
+
+def _serialize_user(user: User) -> str:
+    data = {field: getattr(user, field) for field in USER_CACHE_FIELDS}
+    data["created_at"] = data["created_at"].isoformat()
+    data["updated_at"] = data["updated_at"].isoformat()
+    return json.dumps(data)
+
+
+def _deserialize_user(raw: str) -> User:
+    data = json.loads(raw)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    data["updated_at"] = datetime.fromisoformat(data["updated_at"])
+    user = User(**data)
+    # Mark it as an existing row so the session can UPDATE it without loading it first
+    make_transient_to_detached(user)
+    return user
+
+
+async def cache_user(user: User):
+    if redis_client is None:
+        return
+
+    try:
+        await redis_client.setex(
+            f"{USER_CACHE_PREFIX}{user.email}", USER_CACHE_TTL, _serialize_user(user))
+    except RedisError:
+        pass  # caching is best-effort
+
+
+async def load_user(db: AsyncSession, email: str, cached: str | None) -> User | None:
+    """Build the user from an already-fetched cache entry, or load (and cache) it from the database."""
+    if cached:
+        user = _deserialize_user(cached)
+        db.add(user)
+        return user
+
+    user = await get_user_from_token(db, email)
+    if user:
+        await cache_user(user)
+    return user
+
+
+async def get_cached_user(db: AsyncSession, email: str) -> User | None:
+    """Resolve a user by email from Redis, falling back to the database on a miss or Redis error."""
+    cached = None
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(f"{USER_CACHE_PREFIX}{email}")
+        except RedisError:
+            pass
+
+    return await load_user(db, email, cached)
+
+
+async def per_message_redis(user_id: int, email: str) -> tuple[bool, str | None]:
+    """
+    Count one request against the user's rate limit and fetch their cached identity,
+    in a single round trip. Returns (request allowed, cached user or None).
+    """
+    if redis_client is None:
+        return True, None
+
+    key = f"{RATE_LIMIT_PREFIX}{user_id}"
+    for _ in range(2):
+        if rate_limit_sha is None:
+            await load_scripts()
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.evalsha(rate_limit_sha, 1, key, RATE_LIMIT_TIMES, RATE_LIMIT_WINDOW)
+                pipe.get(f"{USER_CACHE_PREFIX}{email}")
+                (allowed, _), cached = await pipe.execute()
+            return bool(allowed), cached
+        except NoScriptError:
+            # Redis restarted or flushed its script cache: load again and retry once
+            await load_scripts()
+        except RedisError:
+            break
+
+    return True, None  # fail open: neither limiting nor caching may take the socket down
@@ -1,35 +1,47 @@
 import os
-import json
+from dataclasses import dataclass
+
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-class Settings:
-    GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-    GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-    DATABASE_URL = os.getenv('DATABASE_URL')
-    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+_DEFAULT_CORS_ORIGINS = '["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:8080", "http://127.0.0.1:8080"]'
 
-    _default_cors_origins = '["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:8080", "http://127.0.0.1:8080"]'
+
+def _parse_cors_origins() -> tuple[str, ...]:
     try:
-        CORS_ORIGINS = json.loads(
-            os.getenv("CORS_ORIGINS", _default_cors_origins))
-    except json.JSONDecodeError:
+        return tuple(orjson.loads(os.getenv("CORS_ORIGINS", _DEFAULT_CORS_ORIGINS)))
+    except orjson.JSONDecodeError:
         # Fallback to safe defaults if env var contains invalid JSON
-        CORS_ORIGINS = json.loads(_default_cors_origins)
+        return tuple(orjson.loads(_DEFAULT_CORS_ORIGINS))
+
+
+# Read once at import; frozen so nothing rebinds config at runtime, slots for plain attribute reads
+@dataclass(frozen=True, slots=True)
+class Settings:
+    GEMINI_API_KEY: str | None = os.getenv('GEMINI_API_KEY')
+    OPENAI_API_KEY: str | None = os.getenv('OPENAI_API_KEY')
+    GROQ_API_KEY: str | None = os.getenv('GROQ_API_KEY')
+    DATABASE_URL: str | None = os.getenv('DATABASE_URL')
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 40))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+    CORS_ORIGINS: tuple[str, ...] = _parse_cors_origins()
 
-    SECRET_KEY = os.getenv("SECRET_KEY")
-    ALGORITHM = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES = int(
+    SECRET_KEY: str | None = os.getenv("SECRET_KEY")
+    ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-    RATE_LIMIT_TIMES = int(os.getenv("RATE_LIMIT_TIMES", 5))
-    RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", 60))  # seconds
-    AI_USAGE_LIMIT = int(os.getenv("AI_USAGE_LIMIT", 10))
-    RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY")
-    RECAPTCHA_SITE_KEY = os.getenv("RECAPTCHA_SITE_KEY")
-    TESTING = os.getenv("TESTING", "False").lower() == "true"
+    RATE_LIMIT_TIMES: int = int(os.getenv("RATE_LIMIT_TIMES", 5))
+    RATE_LIMIT_WINDOW: int = int(os.getenv("RATE_LIMIT_WINDOW", 60))  # seconds
+    AI_USAGE_LIMIT: int = int(os.getenv("AI_USAGE_LIMIT", 10))
+    USER_CACHE_TTL: int = int(os.getenv("USER_CACHE_TTL", 60))  # seconds
+    RECAPTCHA_SECRET_KEY: str | None = os.getenv("RECAPTCHA_SECRET_KEY")
+    RECAPTCHA_SITE_KEY: str | None = os.getenv("RECAPTCHA_SITE_KEY")
+    TESTING: bool = os.getenv("TESTING", "False").lower() == "true"
 
 
 settings = Settings()
@@ -1,11 +1,26 @@
-from sqlmodel import create_engine, Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core.config import settings
 
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+# Sized for many concurrent WebSocket connections; the defaults (5 + 10 overflow) run dry under load.
+# SQLite picks its own pool class, which doesn't take these options.
+pool_options = {} if make_url(settings.DATABASE_URL).get_backend_name() == "sqlite" else {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
 
+engine = create_async_engine(settings.DATABASE_URL, echo=True, **pool_options)
 
-def get_db():
-    with Session(engine) as db:
-        yield db
\ No newline at end of file
+# expire_on_commit=False keeps loaded attributes usable after commit (no implicit lazy reload in async)
+AsyncSessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -14,5 +14,10 @@ PROVIDER_AVAILABILITY = {
 }
 
 
+# Checked on every chat message; a set membership test beats dict.get (no method call)
+_AVAILABLE_PROVIDERS = frozenset(
+    model for model, available in PROVIDER_AVAILABILITY.items() if available)
+
+
 def is_provider_available(model_name: AIModels) -> bool:
-    return PROVIDER_AVAILABILITY.get(model_name, False)
+    return model_name in _AVAILABLE_PROVIDERS
@@ -1,7 +1,12 @@
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 
-password_hash = PasswordHash.recommended()
+# argon2id at 64 MiB; one lane, since requests already run hashes in parallel threads.
+# Hashes made with other parameters (e.g. the previous defaults) still verify.
+password_hash = PasswordHash((
+    Argon2Hasher(time_cost=2, memory_cost=64 * 1024, parallelism=1),
+))
 
 
 def verify_password(plain_password, hashed_password):
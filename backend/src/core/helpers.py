@@ -2,12 +2,14 @@ from __future__ import annotations
 from typing import Optional
 
 import openai
-from fastapi import HTTPException, status
-from sqlmodel import select, Session
-from pydantic import EmailStr, ValidationError
+from fastapi import HTTPException, WebSocketDisconnect, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from pydantic import EmailStr, TypeAdapter, ValidationError
 
 from src.schemas.chat_schema import WebSocketMessage
 from src.models.user import User
+from src.ai.base import AIPlatform
 from src.ai.gemini import Gemini
 from src.ai.groq import GroqAI
 # from src.ai.openai import OpenAI
@@ -23,30 +25,44 @@ PLATFORM_MAP = {
     # AIModels.OPENAI: OpenAI,
 }
 
+# Adapters own an async SDK client (and its connection pool), so build one per model and reuse it
+PLATFORM_INSTANCES: dict[AIModels, AIPlatform] = {}
 
-def check_email_exists(email: str, db: Session, user: Optional[User] = None):
+# Built once: validates raw frame text/bytes straight into the model, no intermediate dict
+_WS_MSG_ADAPTER = TypeAdapter(WebSocketMessage)
+
+
+async def check_email_exists(email: str, db: AsyncSession, user: Optional[User] = None):
     query = select(User).where(User.email == email)
     if user:
         query = query.where(User.id != user.id)
 
-    return db.scalar(query)
+    return await db.scalar(query)
 
 
-def check_username_exists(username: str, db: Session, user: Optional[User] = None):
+async def check_username_exists(username: str, db: AsyncSession, user: Optional[User] = None):
     query = select(User).where(User.username == username)
     if user:
         query = query.where(User.id != user.id)
 
-    return db.scalar(query)
+    return await db.scalar(query)
+
 
+async def get_user_from_token(db: AsyncSession, email: EmailStr):
+    return await db.scalar(select(User).where(User.email == email))
 
-def get_user_from_token(db: Session, email: EmailStr):
-    return db.scalar(select(User).where(User.email == email))
 
+async def receive_ws_message(websocket) -> str | bytes:
+    # Raw frame payload (text or binary), so it can go straight to orjson without a json.loads hop
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    return message.get("text") or message.get("bytes")
 
-async def parse_ws_message(websocket, raw_data):
+
+async def parse_ws_message(websocket, raw_data: str | bytes):
     try:
-        return WebSocketMessage(**raw_data)
+        return _WS_MSG_ADAPTER.validate_json(raw_data)
     except ValidationError as e:
         await websocket.send_json({"error": "invalid_input", "detail": e.errors()})
         return None
@@ -86,6 +102,9 @@ def load_system_prompt():
 
 
 def get_ai_platform(model_name: AIModels):
+    if model_name in PLATFORM_INSTANCES:
+        return PLATFORM_INSTANCES[model_name]
+
     system_prompt = load_system_prompt()
 
     platform_class = PLATFORM_MAP.get(model_name)
@@ -104,7 +123,9 @@ def get_ai_platform(model_name: AIModels):
         )
 
     try:
-        return platform_class(api_key=api_key, system_prompt=system_prompt)
+        platform = platform_class(api_key=api_key, system_prompt=system_prompt)
+        PLATFORM_INSTANCES[model_name] = platform
+        return platform
     except openai.RateLimitError as e:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -0,0 +1,134 @@
+import asyncio
+from collections import Counter
+
+from sqlalchemy import bindparam, insert, select, update
+
+from src.core import database
+from src.models.chat_history import ChatHistory
+from src.models.user import User
+
+
+_CLOSE = object()  # queue sentinel: write what is pending, then stop
+
+# (user_id, n) pairs; a Core UPDATE so ai_requests_count is incremented in SQL, not overwritten
+_INCREMENT_REQUESTS = (
+    update(User.__table__)
+    .where(User.__table__.c.id == bindparam("uid"))
+    .values(ai_requests_count=User.__table__.c.ai_requests_count + bindparam("n"))
+)
+
+
+async def write_batch(entries: list[tuple[ChatHistory, bool]]) -> dict[int, int]:
+    """
+    Insert the chats and bump each user's request count by their counted rows, in one commit.
+    Returns every user's committed ai_requests_count, keyed by user id.
+    """
+    rows = [chat.model_dump(exclude={"id"}) for chat, _ in entries]
+    increments = Counter(chat.user_id for chat, counted in entries if counted)
+    user_ids = {chat.user_id for chat, _ in entries}
+
+    async with database.AsyncSessionLocal() as db:
+        # Multi-row INSERT ... VALUES; RETURNING hands the ids back in row order
+        result = await db.exec(
+            insert(ChatHistory).returning(ChatHistory.id, sort_by_parameter_order=True),
+            params=rows
+        )
+        ids = result.scalars().all()
+
+        if increments:
+            await db.exec(_INCREMENT_REQUESTS, params=[
+                {"uid": user_id, "n": n} for user_id, n in increments.items()])
+
+        # Read the counts back inside the transaction: other connections may have
+        # incremented the same users, so an in-memory count would be stale
+        request_counts = dict((await db.exec(
+            select(User.id, User.ai_requests_count).where(User.id.in_(user_ids))
+        )).all())
+
+        await db.commit()
+
+    for (chat, _), chat_id in zip(entries, ids):
+        chat.id = chat_id
+
+    return request_counts
+
+
+class ChatHistoryWriter:
+    """
+    Group-commits ChatHistory rows from all connections.
+
+    Rows submitted within `max_delay` seconds of each other (up to `max_batch`)
+    are written with one INSERT and one commit; each caller waits on a future
+    that resolves to its user's committed request count.
+    """
+
+    def __init__(self, max_batch: int = 32, max_delay: float = 0.01):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def save(self, chat: ChatHistory, count_request: bool) -> int:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((chat, count_request, future))
+        return await future
+
+    async def close(self):
+        """Write pending rows and stop the background task."""
+        if not self._task.done():
+            self._queue.put_nowait(_CLOSE)
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        closing = False
+        while not closing:
+            batch = [await self._queue.get()]
+
+            await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if _CLOSE in batch:
+                closing = True
+                batch = [item for item in batch if item is not _CLOSE]
+
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        try:
+            request_counts = await write_batch([(chat, counted) for chat, counted, _ in batch])
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for chat, _, future in batch:
+            if not future.done():
+                future.set_result(request_counts[chat.user_id])
+
+
+# Shared writer, started and closed in main.lifespan
+writer: ChatHistoryWriter | None = None
+
+
+def start_writer() -> ChatHistoryWriter:
+    global writer
+    writer = ChatHistoryWriter()
+    return writer
+
+
+async def close_writer():
+    global writer
+    if writer is not None:
+        await writer.close()
+        writer = None
+
+
+async def save_chat(chat: ChatHistory, count_request: bool) -> int:
+    """Persist the chat (filling in chat.id) and return the user's committed ai_requests_count."""
+    # Without a running writer (scripts, direct repository calls) write the row on its own
+    if writer is None:
+        return (await write_batch([(chat, count_request)]))[chat.user_id]
+    return await writer.save(chat, count_request)
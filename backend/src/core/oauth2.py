@@ -2,7 +2,8 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, status, WebSocket
 from fastapi.security import OAuth2PasswordBearer  
-from sqlmodel import select, Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.core.database import get_db
 
 from src.models.user import User
@@ -12,7 +13,7 @@ from src.core.token import verify_access_token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(token_str: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)) -> User:
+async def get_current_user(token_str: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -21,7 +22,7 @@ def get_current_user(token_str: Annotated[str, Depends(oauth2_scheme)], db: Sess
     
     token_data = verify_access_token(token_str, credentials_exception)
 
-    user = db.scalar(select(User).where(User.email == token_data.email))
+    user = await db.scalar(select(User).where(User.email == token_data.email))
     if user is None:
         raise credentials_exception
 
@@ -1,10 +1,55 @@
 
-import requests
+import hashlib
+
+import httpx
 from fastapi import HTTPException, status
+from redis.exceptions import RedisError
 from src.core.config import settings
+from src.core import cache
 
 RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
 
+# Successful verifications are remembered for a retry window shorter than Google's ~2 min token lifetime
+RECAPTCHA_CACHE_PREFIX = "rc:"
+RECAPTCHA_CACHE_TTL = 90  # seconds
+
+# Shared keep-alive client, opened and closed in main.lifespan
+http_client: httpx.AsyncClient | None = None
+
+
+def init_http_client() -> httpx.AsyncClient:
+    global http_client
+    http_client = httpx.AsyncClient(
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+async def _get_cached_verification(key: str) -> bool:
+    if cache.redis_client is None:
+        return False
+    try:
+        return await cache.redis_client.get(key) is not None
+    except RedisError:
+        return False  # fail open to a live verification
+
+
+async def _cache_verification(key: str):
+    if cache.redis_client is None:
+        return
+    try:
+        await cache.redis_client.setex(key, RECAPTCHA_CACHE_TTL, "1")
+    except RedisError:
+        pass
+
 
 async def verify_recaptcha_token(recaptcha_token: str) -> bool:
 
@@ -17,14 +62,19 @@ async def verify_recaptcha_token(recaptcha_token: str) -> bool:
             detail="reCAPTCHA token is required"
         )
 
+    cache_key = RECAPTCHA_CACHE_PREFIX + hashlib.sha256(recaptcha_token.encode()).hexdigest()
+    if await _get_cached_verification(cache_key):
+        return True
+
+    client = http_client or init_http_client()
+
     try:
-        response = requests.post(
+        response = await client.post(
             RECAPTCHA_VERIFY_URL,
             data={
                 "secret": settings.RECAPTCHA_SECRET_KEY,
                 "response": recaptcha_token
-            },
-            timeout=10
+            }
         )
         response.raise_for_status()
 
@@ -36,9 +86,10 @@ async def verify_recaptcha_token(recaptcha_token: str) -> bool:
                 detail="reCAPTCHA verification failed. Please try again."
             )
 
+        await _cache_verification(cache_key)
         return True
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error verifying reCAPTCHA: {str(e)}"
@@ -1,11 +1,13 @@
 import os
-from sqlmodel import Session, select
+import asyncio
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.models.user import User
 from src.core.hashing import hash_password
-from src.core.database import engine
+from src.core.database import AsyncSessionLocal
 
 
-def seed_admin_user(db: Session) -> User | None:
+async def seed_admin_user(db: AsyncSession) -> User | None:
 
     required_vars = [
         "ADMIN_EMAIL",
@@ -23,7 +25,7 @@ def seed_admin_user(db: Session) -> User | None:
     admin_password = os.getenv("ADMIN_PASSWORD")
     admin_name = os.getenv("ADMIN_NAME")
 
-    existing_user = db.scalar(
+    existing_user = await db.scalar(
         select(User).where(
             (User.email == admin_email) | (User.username == admin_username)
         )
@@ -33,8 +35,8 @@ def seed_admin_user(db: Session) -> User | None:
         if not existing_user.is_unlimited:
             existing_user.is_unlimited = True
             db.add(existing_user)
-            db.commit()
-            db.refresh(existing_user)
+            await db.commit()
+            await db.refresh(existing_user)
         return existing_user
 
     # Create new admin user
@@ -49,23 +51,27 @@ def seed_admin_user(db: Session) -> User | None:
 
     try:
         db.add(admin_user)
-        db.commit()
-        db.refresh(admin_user)
+        await db.commit()
+        await db.refresh(admin_user)
         return admin_user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise Exception(f"Failed to seed admin user: {str(e)}")
 
 
+async def main():
+    async with AsyncSessionLocal() as db:
+        admin = await seed_admin_user(db)
+        if admin:
+            print(f"Admin user seeded successfully: {admin.email}")
+        else:
+            print("Admin user already exists")
+
+
 if __name__ == "__main__":
 
     if os.getenv("ENABLE_DEV_SEEDER") != "true":
         raise RuntimeError("Seeder is disabled in this environment")
     
-    with Session(engine) as db:
-        admin = seed_admin_user(db)
-        if admin:
-            print(f"Admin user seeded successfully: {admin.email}")
-        else:
-            print("Admin user already exists")
+    asyncio.run(main())
 
@@ -10,6 +10,10 @@ from src.core.enums import AIModels
 class ChatHistory(SQLModel, table=True):
     
     __tablename__ = "chat_history"
+    # Covers the history lookup: equality on user/model, newest-first scan on created_at
+    __table_args__ = (
+        sa.Index("ix_chat_history_user_model_created", "user_id", "model_name", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
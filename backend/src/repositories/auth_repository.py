@@ -1,7 +1,10 @@
+import asyncio
 from datetime import timedelta
 
 from fastapi import status, HTTPException
-from sqlmodel import select, Session
+from sqlalchemy import union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core.token import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from src.core.recaptcha import verify_recaptcha_token
@@ -11,17 +14,17 @@ from src.schemas.auth_schema import SignUpSchema, LoginSchema
 from src.core.helpers import check_email_exists, check_username_exists
 
 
-async def signup(data: SignUpSchema, db: Session):
+async def signup(data: SignUpSchema, db: AsyncSession):
     # Verify reCAPTCHA token BEFORE processing signup
     await verify_recaptcha_token(data.recaptcha_token)
 
-    if check_email_exists(data.email, db):
+    if await check_email_exists(data.email, db):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    if check_username_exists(data.username, db):
+    if await check_username_exists(data.username, db):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
@@ -29,35 +32,41 @@ async def signup(data: SignUpSchema, db: Session):
 
     user_data = data.model_dump(
         exclude={'recaptcha_token'})  # Don't store the token
-    user_data['password'] = hash_password(user_data['password'])
+    # argon2 (native, releases the GIL) runs off the event loop
+    user_data['password'] = await asyncio.to_thread(hash_password, user_data['password'])
 
     user = User(**user_data)
     try:
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 
-async def login(data: LoginSchema, db: Session):
+async def login(data: LoginSchema, db: AsyncSession):
     # Verify reCAPTCHA token BEFORE processing login
     await verify_recaptcha_token(data.recaptcha_token)
 
-    user = db.scalar(select(User).where(
-        (User.email == data.login) | (User.username == data.login)))
+    # UNION ALL of two equality lookups: each side uses its own unique index, where an OR across
+    # the two columns can fall back to a full scan
+    login_query = union_all(
+        select(User).where(User.email == data.login),
+        select(User).where(User.username == data.login),
+    ).limit(1)
+    user = await db.scalar(select(User).from_statement(login_query))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    if not verify_password(data.password, user.password):
+    if not await asyncio.to_thread(verify_password, data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Incorrect password"
@@ -1,5 +1,8 @@
+import orjson
 from fastapi import HTTPException, WebSocket, status
-from sqlmodel import Session, select
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.schemas.chat_schema import ChatRequest, WebSocketMessage
 from src.core.helpers import get_ai_platform
@@ -7,6 +10,20 @@ from src.models.user import User
 from src.core.enums import AIModels, is_provider_available
 from src.models.chat_history import ChatHistory
 from src.core.config import settings
+from src.core.cache import cache_user
+from src.core.history_writer import save_chat
+
+
+# Fixed for the process lifetime; bound once instead of looked up on settings per message
+AI_USAGE_LIMIT = settings.AI_USAGE_LIMIT
+
+CHAT_HISTORY_LIMIT = 100  # most recent messages returned per model
+
+# Fixed WebSocket errors, encoded once; the batching sender writes bytes payloads as-is
+PROVIDER_UNAVAILABLE_ERROR = orjson.dumps(
+    {"error": "This AI provider is currently unavailable due to free-tier limits."})
+USAGE_LIMIT_ERROR = orjson.dumps(
+    {"error": f"AI usage limit reached. You have used all {AI_USAGE_LIMIT} free messages."})
 
 
 def check_usage_limit(user: User) -> tuple[bool, int]:
@@ -14,7 +31,7 @@ def check_usage_limit(user: User) -> tuple[bool, int]:
     if user.is_unlimited:
         return (True, -1)  # -1 indicates unlimited
 
-    remaining = max(0, settings.AI_USAGE_LIMIT - user.ai_requests_count)
+    remaining = max(0, AI_USAGE_LIMIT - user.ai_requests_count)
 
     if remaining == 0:
         return (False, 0)
@@ -22,27 +39,23 @@ def check_usage_limit(user: User) -> tuple[bool, int]:
     return (True, remaining)
 
 
-async def generate_model_response(data: WebSocketMessage, current_user: User, db: Session, websocket: WebSocket):
+async def generate_model_response(data: WebSocketMessage, current_user: User, db: AsyncSession, websocket: WebSocket):
     # Check provider availability BEFORE any other checks
     if not is_provider_available(data.model_name):
-        await websocket.send_json({
-            "error": "This AI provider is currently unavailable due to free-tier limits."
-        })
+        await websocket.send_json(PROVIDER_UNAVAILABLE_ERROR)
         return None, None
 
     # Check usage limit BEFORE calling AI provider
     allowed, remaining = check_usage_limit(current_user)
 
     if not allowed:
-        await websocket.send_json({
-            "error": f"AI usage limit reached. You have used all {settings.AI_USAGE_LIMIT} free messages."
-        })
+        await websocket.send_json(USAGE_LIMIT_ERROR)
         return None, None
 
     platform = get_ai_platform(data.model_name)
 
     try:
-        response_text = platform.chat(data.prompt)
+        response_text = await platform.chat(data.prompt)
     except Exception as e:
         await websocket.send_json({
             "error": f"AI platform error: {str(e)}"
@@ -52,42 +65,48 @@ async def generate_model_response(data: WebSocketMessage, current_user: User, db
     try:
         chat = ChatHistory(user_id=current_user.id, prompt=data.prompt,
                            response=response_text, model_name=data.model_name)
-        db.add(chat)
 
-        # Increment counter AFTER successful AI response
-        if not current_user.is_unlimited:
-            current_user.ai_requests_count += 1
+        # Group-committed with other connections' rows; the counter is incremented AFTER a
+        # successful AI response, in SQL, as part of the same commit
+        requests_count = await save_chat(chat, not current_user.is_unlimited)
 
-        db.add(current_user)
-        db.commit()
-        db.refresh(chat)
-        db.refresh(current_user)
+        # Take the committed count (other sockets of this user may have counted too),
+        # without marking the user dirty in this session
+        set_committed_value(current_user, "ai_requests_count", requests_count)
+
+        # Write-through so cached identities see the new count
+        await cache_user(current_user)
 
         if current_user.is_unlimited:
             final_remaining = -1
         else:
             final_remaining = max(
-                0, settings.AI_USAGE_LIMIT - current_user.ai_requests_count)
+                0, AI_USAGE_LIMIT - current_user.ai_requests_count)
 
         return chat, final_remaining
     except Exception as e:
-        db.rollback()
         await websocket.send_json({
             "error": f"Database error: {str(e)}"
         })
         return None, None
 
 
-def get_chat_history(model_name: AIModels, current_user: User, db: Session):
-    chat_records = db.scalars(select(ChatHistory).where(
-        ChatHistory.user_id == current_user.id,
-        ChatHistory.model_name == model_name.value)
-    ).all()
-    return chat_records
+async def get_chat_history(model_name: AIModels, current_user: User, db: AsyncSession, limit: int = CHAT_HISTORY_LIMIT):
+    # Only the columns the Chat schema renders; newest first so the LIMIT keeps the latest
+    # messages (served by ix_chat_history_user_model_created), then back to chronological order
+    chat_records = (await db.exec(
+        select(ChatHistory.prompt, ChatHistory.response, ChatHistory.model_name, ChatHistory.created_at)
+        .where(
+            ChatHistory.user_id == current_user.id,
+            ChatHistory.model_name == model_name.value)
+        .order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc())
+        .limit(limit)
+    )).all()
+    return chat_records[::-1]
 
 
 # old non-real-time chat code
-def chat(data: ChatRequest, current_user: User, db: Session):
+async def chat(data: ChatRequest, current_user: User, db: AsyncSession):
     # Check provider availability BEFORE any other checks
     if not is_provider_available(data.model_name):
         raise HTTPException(
@@ -101,13 +120,13 @@ def chat(data: ChatRequest, current_user: User, db: Session):
     if not allowed:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"AI usage limit reached. You have used all {settings.AI_USAGE_LIMIT} free messages."
+            detail=f"AI usage limit reached. You have used all {AI_USAGE_LIMIT} free messages."
         )
 
     platform = get_ai_platform(data.model_name)
 
     try:
-        response_text = platform.chat(data.prompt)
+        response_text = await platform.chat(data.prompt)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"AI platform error: {str(e)}")
@@ -122,20 +141,20 @@ def chat(data: ChatRequest, current_user: User, db: Session):
             current_user.ai_requests_count += 1
 
         db.add(current_user)
-        db.commit()
-        db.refresh(chat_record)
-        db.refresh(current_user)
+        await db.commit()
+
+        await cache_user(current_user)
 
         # Calculate remaining requests after increment
         if current_user.is_unlimited:
             final_remaining = -1
         else:
             final_remaining = max(
-                0, settings.AI_USAGE_LIMIT - current_user.ai_requests_count)
+                0, AI_USAGE_LIMIT - current_user.ai_requests_count)
 
         return response_text, final_remaining
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {str(e)}"
@@ -3,8 +3,14 @@ import os
 os.environ["TESTING"] = "true"
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from redis.exceptions import ConnectionError as RedisConnectionError, NoScriptError
 from sqlmodel import Session, create_engine, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core import database
 from main import app
@@ -15,6 +21,72 @@ TEST_ALGORITHM = "HS256"
 TEST_TOKEN_EXPIRE_MINUTES = 30
 
 
+# In-memory stand-ins for the shared Redis client
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.scripts = set()
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def script_load(self, script):
+        self.scripts.add("rate-limit-sha")
+        return "rate-limit-sha"
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def evalsha(self, sha, numkeys, key, times, window):
+        self.commands.append(("evalsha", sha, key, times))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    async def execute(self):
+        store, results = self.redis.store, []
+        for name, *args in self.commands:
+            if name == "evalsha":
+                # Same contract as cache.RATE_LIMIT_SCRIPT
+                sha, key, times = args
+                if sha not in self.redis.scripts:
+                    raise NoScriptError("No matching script")
+                store[key] = store.get(key, 0) + 1
+                results.append([int(store[key] <= times), max(times - store[key], 0)])
+            else:
+                results.append(store.get(args[0]))
+        return results
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise RedisConnectionError("redis is down")
+
+    async def setex(self, key, ttl, value):
+        raise RedisConnectionError("redis is down")
+
+    async def script_load(self, script):
+        raise RedisConnectionError("redis is down")
+
+    def pipeline(self, transaction=True):
+        raise RedisConnectionError("redis is down")
+
+
 @pytest.fixture(autouse=True)
 def mock_settings(monkeypatch):
     monkeypatch.setattr("src.core.token.SECRET_KEY", TEST_SECRET_KEY)
@@ -53,6 +125,15 @@ def mock_rate_limiter(monkeypatch):
         pass  # fastapi_limiter not installed
 
 
+@pytest.fixture(autouse=True)
+def mock_redis_cache(monkeypatch):
+    """Keep the app cache disabled so tests never reach a real Redis"""
+    from src.core import cache
+
+    monkeypatch.setattr(cache, "init_redis", lambda redis_url: None)
+    monkeypatch.setattr(cache, "redis_client", None)
+
+
 @pytest.fixture
 def sample_user():
     from src.models.user import User  # Import here instead
@@ -65,13 +146,14 @@ def sample_user():
     )
 
 
-@pytest.fixture(scope="function")
-def test_db():
+@pytest.fixture(scope="module")
+def test_engine():
     # Import models here to avoid circular import
     from src.models.user import User
     from src.models.chat_history import ChatHistory
 
-    # Create temporary database file
+    # One temporary database file per test module, so xdist workers never share one;
+    # test_db empties it between tests
     db_fd, db_path = tempfile.mkstemp(suffix=".db")
     test_db_url = f"sqlite:///{db_path}"
 
@@ -83,25 +165,86 @@ def test_db():
 
     SQLModel.metadata.create_all(test_engine)
 
-    # Replace the global engine in database module
+    # The app talks to the same file through an async engine.
+    # NullPool: connections are never shared between the pytest and TestClient event loops
+    test_async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        poolclass=NullPool,
+        echo=False
+    )
+
+    # Replace the global engine and session factory in database module
     original_engine = database.engine
-    database.engine = test_engine
+    original_session_local = database.AsyncSessionLocal
+    database.engine = test_async_engine
+    database.AsyncSessionLocal = async_sessionmaker(
+        test_async_engine, class_=AsyncSession, expire_on_commit=False)
 
-    # Create test db
-    with Session(test_engine) as test_db:
-        yield test_db
+    yield test_engine
 
     # Restore original engine
     database.engine = original_engine
+    database.AsyncSessionLocal = original_session_local
 
     # Cleanup
+    test_async_engine.sync_engine.dispose()
     test_engine.dispose()
     os.close(db_fd)
     os.unlink(db_path)
 
 
-# TestClient for integration tests
+@pytest.fixture(scope="module")
+def kept_user_ids():
+    """Users created by module-scoped fixtures; the per-test cleanup leaves these rows in place"""
+    return set()
+
+
+@pytest.fixture(scope="function")
+def test_db(test_engine, kept_user_ids):
+    from src.models.user import User
+    from src.models.chat_history import ChatHistory
+
+    with Session(test_engine) as test_db:
+        yield test_db
+
+    # Roll the module database back to its baseline for the next test
+    with test_engine.begin() as connection:
+        connection.execute(delete(ChatHistory))
+        connection.execute(delete(User).where(User.id.not_in(list(kept_user_ids))))
+
+
+# AsyncSession on the test database, for calling repositories directly
+@pytest_asyncio.fixture
+async def async_test_db(test_db):
+    async with database.AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """One TestClient (and app lifespan) for the whole run"""
+    from fastapi_limiter import FastAPILimiter
+    from src.core import cache, history_writer
+
+    async def noop(*args, **kwargs):
+        pass
+
+    # The function-scoped mocks aren't active yet at startup (nor any more at shutdown),
+    # so keep the lifespan away from Redis for the client's whole lifetime
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(FastAPILimiter, "init", noop)
+        mp.setattr(FastAPILimiter, "close", noop)
+        mp.setattr(cache, "init_redis", lambda redis_url: None)
+        # A writer task would live on the client's event loop for the whole run, and async
+        # tests on pytest's loop would then wait on it forever; write chats inline instead
+        mp.setattr(history_writer, "start_writer", lambda: None)
+
+        with TestClient(app) as test_client:
+            yield test_client
+
+
+# TestClient for integration tests; the app reads database.AsyncSessionLocal per request,
+# so the shared client always talks to the current module's test database
 @pytest.fixture
-def client(test_db):
-    with TestClient(app) as test_client:
-        yield test_client
+def client(test_db, app_client):
+    return app_client
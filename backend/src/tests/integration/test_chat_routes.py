@@ -1,35 +1,67 @@
 import pytest
 
-from src.core.config import settings
 from src.models.chat_history import ChatHistory
 from src.core.enums import AIModels
+from src.core.hashing import hash_password
+
+
+# argon2 is deliberately slow; hash the shared test password once for the whole module
+HASHED_PASSWORD = hash_password("password123")
+
+# Chat history behaves the same for every model
+HISTORY_MODELS = [
+    pytest.param(AIModels.GROQ, id="groq"),
+    pytest.param(AIModels.GEMINI, id="gemini"),
+]
+
+
+@pytest.fixture(scope="module")
+def chat_user_id(test_engine, kept_user_ids):
+    from sqlmodel import Session
+    from src.models.user import User
+
+    # Created (and its password hashed) once per module; kept across the per-test cleanup
+    with Session(test_engine) as session:
+        user = User(
+            email="chatuser@example.com",
+            username="chatuser",
+            name="Chat User",
+            password=HASHED_PASSWORD
+        )
+        session.add(user)
+        session.commit()
+        kept_user_ids.add(user.id)
+        return user.id
+
+
+@pytest.fixture(scope="module")
+def login_cache():
+    return {}
 
 
 @pytest.fixture
-def authenticated_user(client, test_db):
+def authenticated_user(client, test_db, chat_user_id, login_cache):
     from src.models.user import User
-    from src.core.hashing import hash_password
 
-    user = User(
-        email="chatuser@example.com",
-        username="chatuser",
-        name="Chat User",
-        password=hash_password("password123")
-    )
-    test_db.add(user)
+    # Undo whatever the previous test did to the shared row
+    user = test_db.get(User, chat_user_id)
+    user.ai_requests_count = 0
+    user.is_unlimited = False
     test_db.commit()
     test_db.refresh(user)
 
-    response = client.post("/auth/login", json={
-        "login": "chatuser@example.com",
-        "password": "password123",
-        "recaptcha_token": "test-token-no-verification"
-    })
+    # Log in over HTTP once per module; the token stays valid for the whole run
+    if "token" not in login_cache:
+        response = client.post("/auth/login", json={
+            "login": "chatuser@example.com",
+            "password": "password123",
+            "recaptcha_token": "test-token-no-verification"
+        })
 
-    assert response.status_code == 200, response.json()
-    token = response.json()["access_token"]
+        assert response.status_code == 200, response.json()
+        login_cache["token"] = response.json()["access_token"]
 
-    return user, token
+    return user, login_cache["token"]
 
 
 def test_get_platforms_returns_all_models(client):
@@ -51,27 +83,39 @@ def test_get_platforms_includes_groq(client):
     assert AIModels.GROQ.value in platforms
 
 
-def test_get_chat_history_requires_authentication(client):
+def test_get_provider_availability_lists_every_model(client):
+
+    response = client.get("/ai/provider-availability")
+
+    assert response.status_code == 200
+    availability = response.json()["availability"]
+    assert set(availability) == {model.value for model in AIModels}
+    assert availability[AIModels.GROQ.value] is True
+
+
+@pytest.mark.parametrize("model", HISTORY_MODELS)
+def test_get_chat_history_requires_authentication(client, model):
 
     response = client.get(
-        f"/ai/chat-history?model_name={AIModels.GROQ.value}")
+        f"/ai/chat-history?model_name={model.value}")
 
     assert response.status_code == 401
 
 
-def test_get_chat_history_returns_user_chats(client, test_db, authenticated_user):
+@pytest.mark.parametrize("model", HISTORY_MODELS)
+def test_get_chat_history_returns_user_chats(client, test_db, authenticated_user, model):
     user, access_token = authenticated_user
 
     chat2 = ChatHistory(
         user_id=user.id,
         prompt="How are you?",
         response="I'm doing well!",
-        model_name=AIModels.GROQ
+        model_name=model
     )
     test_db.add(chat2)
     test_db.commit()
 
-    response = client.get(f'/ai/chat-history?model_name={AIModels.GROQ.value}',
+    response = client.get(f'/ai/chat-history?model_name={model.value}',
                           headers={"Authorization": f"Bearer {access_token}"}
                           )
 
@@ -82,36 +126,39 @@ def test_get_chat_history_returns_user_chats(client, test_db, authenticated_user
     assert "usage_info" in data
 
 
-def test_get_chat_history_filters_by_model(client, test_db, authenticated_user):
+@pytest.mark.parametrize("model", HISTORY_MODELS)
+def test_get_chat_history_filters_by_model(client, test_db, authenticated_user, model):
 
     user, token = authenticated_user
 
-    groq_chat = ChatHistory(
-        user_id=user.id,
-        prompt="Groq prompt",
-        response="Groq response",
-        model_name=AIModels.GROQ
-    )
-    test_db.add(groq_chat)
+    # One chat per model; only the requested model's chat may come back
+    for chat_model in AIModels:
+        test_db.add(ChatHistory(
+            user_id=user.id,
+            prompt=f"{chat_model.value} prompt",
+            response=f"{chat_model.value} response",
+            model_name=chat_model
+        ))
     test_db.commit()
 
     response = client.get(
-        f"/ai/chat-history?model_name={AIModels.GROQ.value}",
+        f"/ai/chat-history?model_name={model.value}",
         headers={"Authorization": f"Bearer {token}"}
     )
 
     data = response.json()
     print(data['chat'])
     assert len(data["chat"]) == 1
-    assert data["chat"][0]["model_name"] == AIModels.GROQ.value
+    assert data["chat"][0]["model_name"] == model.value
 
 
-def test_get_chat_history_returns_empty_when_no_chats(client, authenticated_user):
+@pytest.mark.parametrize("model", HISTORY_MODELS)
+def test_get_chat_history_returns_empty_when_no_chats(client, authenticated_user, model):
 
     user, token = authenticated_user
 
     response = client.get(
-        f"/ai/chat-history?model_name={AIModels.GROQ.value}",
+        f"/ai/chat-history?model_name={model.value}",
         headers={"Authorization": f"Bearer {token}"}
     )
 
@@ -119,9 +166,9 @@ def test_get_chat_history_returns_empty_when_no_chats(client, authenticated_user
     assert data["chat"] == []
 
 
-def test_get_chat_history_only_returns_own_chats(client, test_db, authenticated_user):
+@pytest.mark.parametrize("model", HISTORY_MODELS)
+def test_get_chat_history_only_returns_own_chats(client, test_db, authenticated_user, model):
     from src.models.user import User
-    from src.core.hashing import hash_password
 
     user, token = authenticated_user
 
@@ -129,7 +176,7 @@ def test_get_chat_history_only_returns_own_chats(client, test_db, authenticated_
         email="other@example.com",
         username="otheruser",
         name="Other User",
-        password=hash_password("password123")
+        password=HASHED_PASSWORD
     )
     test_db.add(other_user)
     test_db.commit()
@@ -139,13 +186,13 @@ def test_get_chat_history_only_returns_own_chats(client, test_db, authenticated_
         user_id=other_user.id or 0,
         prompt="Other user's chat",
         response="Response",
-        model_name=AIModels.GROQ
+        model_name=model
     )
     test_db.add(other_chat)
     test_db.commit()
 
     response = client.get(
-        f"/ai/chat-history?model_name={AIModels.GROQ.value}",
+        f"/ai/chat-history?model_name={model.value}",
         headers={"Authorization": f"Bearer {token}"}
     )
 
@@ -159,7 +206,7 @@ def test_get_chat_history_includes_usage_info(client, test_db, authenticated_use
 
     # Mock the AI usage limit so the test doesn't depend on real env/config
     mocked_limit = 5
-    monkeypatch.setattr(settings, "AI_USAGE_LIMIT", mocked_limit)
+    monkeypatch.setattr("src.api.chat.AI_USAGE_LIMIT", mocked_limit)
 
     # Persist custom ai_requests_count in the test database
     user.ai_requests_count = 2
@@ -189,8 +236,8 @@ def test_unavailable_model(client, authenticated_user, mocked_model):
     from unittest.mock import patch, AsyncMock
     user, token = authenticated_user
 
-    # Patch the ratelimit instance in the chat module
-    with patch("src.api.chat.ratelimit", new_callable=AsyncMock) as mock_limit:
+    # Patch the per-message rate limit in the chat module
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
         
         with patch("src.repositories.chat_repository.is_provider_available") as mock_avail:
             mock_avail.return_value = False
@@ -204,14 +251,14 @@ def test_unavailable_model(client, authenticated_user, mocked_model):
 
 def test_chat_endpoint_enforces_usage_limit(client, test_db, authenticated_user, monkeypatch):
     
-    from unittest.mock import Mock, patch, AsyncMock
+    from unittest.mock import patch, AsyncMock
 
     user, token = authenticated_user
 
-    with patch("src.api.chat.ratelimit", new_callable=AsyncMock):
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
         
         mocked_limit = 7
-        monkeypatch.setattr(settings, "AI_USAGE_LIMIT", mocked_limit)
+        monkeypatch.setattr("src.repositories.chat_repository.AI_USAGE_LIMIT", mocked_limit)
 
         user.ai_requests_count = mocked_limit
         user.is_unlimited = False
@@ -220,7 +267,7 @@ def test_chat_endpoint_enforces_usage_limit(client, test_db, authenticated_user,
         test_db.refresh(user)
 
         with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-            mock_ai = Mock()
+            mock_ai = AsyncMock()
             mock_ai.chat.return_value = "AI Response"
             mock_platform.return_value = mock_ai
 
@@ -240,15 +287,15 @@ def test_chat_endpoint_enforces_usage_limit(client, test_db, authenticated_user,
 
 
 def test_chat_endpoint_returns_remaining_requests(client, test_db, authenticated_user, monkeypatch):
-    from unittest.mock import Mock, patch, AsyncMock
+    from unittest.mock import patch, AsyncMock
 
     user, token = authenticated_user
 
-    with patch("src.api.chat.ratelimit", new_callable=AsyncMock):
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
 
         # Mock limit so test does not depend on env
         mocked_limit = 10
-        monkeypatch.setattr(settings, "AI_USAGE_LIMIT", mocked_limit)
+        monkeypatch.setattr("src.repositories.chat_repository.AI_USAGE_LIMIT", mocked_limit)
 
         # Set user to have 5 requests used (leaving mocked_limit - 5 remaining before call)
         user.ai_requests_count = 5
@@ -258,7 +305,7 @@ def test_chat_endpoint_returns_remaining_requests(client, test_db, authenticated
         test_db.refresh(user)
 
         with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-            mock_ai = Mock()
+            mock_ai = AsyncMock()
             mock_ai.chat.return_value = "AI Response"
             mock_platform.return_value = mock_ai
 
@@ -282,7 +329,7 @@ def test_chat_endpoint_returns_remaining_requests(client, test_db, authenticated
 
 def test_unlimited_user_bypasses_limit(client, test_db, authenticated_user):
     
-    from unittest.mock import Mock, patch, AsyncMock
+    from unittest.mock import patch, AsyncMock
 
     user, token = authenticated_user
 
@@ -293,10 +340,10 @@ def test_unlimited_user_bypasses_limit(client, test_db, authenticated_user):
     test_db.commit()
     test_db.refresh(user)
 
-    with patch("src.api.chat.ratelimit", new_callable=AsyncMock):
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
 
         with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-            mock_ai = Mock()
+            mock_ai = AsyncMock()
             mock_ai.chat.return_value = "AI Response"
             mock_platform.return_value = mock_ai
 
@@ -317,7 +364,7 @@ def test_unlimited_user_bypasses_limit(client, test_db, authenticated_user):
 
 def test_successful_chat_flow(client, test_db, authenticated_user):
     """Test complete successful chat interaction"""
-    from unittest.mock import Mock, patch, AsyncMock
+    from unittest.mock import patch, AsyncMock
 
     user, token = authenticated_user
     
@@ -327,10 +374,10 @@ def test_successful_chat_flow(client, test_db, authenticated_user):
     test_db.add(user)
     test_db.commit()
     
-    with patch("src.api.chat.ratelimit", new_callable=AsyncMock):
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
 
         with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-            mock_ai = Mock()
+            mock_ai = AsyncMock()
             mock_ai.chat.return_value = "Hello! How can I help you?"
             mock_platform.return_value = mock_ai
             
@@ -353,4 +400,97 @@ def test_successful_chat_flow(client, test_db, authenticated_user):
                 
                 assert response["prompt"] == "Hello AI"
                 assert response["response"] == "Hello! How can I help you?"
-                assert response["model_name"] == AIModels.GROQ.value
\ No newline at end of file
+                assert response["model_name"] == AIModels.GROQ.value
+
+def test_chat_endpoint_tracks_remaining_requests_across_messages(client, test_db, authenticated_user, monkeypatch):
+    from unittest.mock import patch, AsyncMock
+
+    user, token = authenticated_user
+
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
+
+        mocked_limit = 10
+        monkeypatch.setattr("src.repositories.chat_repository.AI_USAGE_LIMIT", mocked_limit)
+
+        with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
+            mock_ai = AsyncMock()
+            mock_ai.chat.return_value = "AI Response"
+            mock_platform.return_value = mock_ai
+
+            # The user is loaded once on connect and reused for every message
+            with client.websocket_connect(f"/ai/ws/chat?token={token}") as websocket:
+                for expected_remaining in (mocked_limit - 1, mocked_limit - 2):
+                    websocket.send_json({
+                        "model_name": AIModels.GROQ.value,
+                        "prompt": "Test prompt"
+                    })
+
+                    response = websocket.receive_json()
+                    assert response["remaining_requests"] == expected_remaining
+
+    test_db.refresh(user)
+    assert user.ai_requests_count == 2
+
+
+def test_chat_endpoint_refetches_user_after_cache_ttl(client, test_db, authenticated_user, monkeypatch):
+    from unittest.mock import patch, AsyncMock
+
+    user, token = authenticated_user
+
+    # Re-fetch on every message so a change made between messages is picked up
+    monkeypatch.setattr("src.api.chat.USER_CACHE_TTL", -1)
+
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
+
+        with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
+            mock_ai = AsyncMock()
+            mock_ai.chat.return_value = "AI Response"
+            mock_platform.return_value = mock_ai
+
+            with client.websocket_connect(f"/ai/ws/chat?token={token}") as websocket:
+                websocket.send_json({"model_name": AIModels.GROQ.value, "prompt": "First"})
+                assert websocket.receive_json()["remaining_requests"] >= 0
+
+                user.is_unlimited = True
+                test_db.add(user)
+                test_db.commit()
+
+                websocket.send_json({"model_name": AIModels.GROQ.value, "prompt": "Second"})
+                assert websocket.receive_json()["remaining_requests"] == -1
+
+
+def test_chat_endpoint_rejects_invalid_input_without_closing(client, authenticated_user):
+    import json
+    from unittest.mock import patch, AsyncMock
+
+    user, token = authenticated_user
+
+    # Every case goes over the same connection: an invalid frame must not close it
+    invalid_frames = [
+        ("text", "{not json"),
+        ("text", json.dumps({"model_name": "unknown", "prompt": "Hello"})),
+        ("bytes", json.dumps({"model_name": "unknown", "prompt": "Hello"}).encode()),
+    ]
+
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(True, None)):
+        with client.websocket_connect(f"/ai/ws/chat?token={token}") as websocket:
+            for frame_type, frame in invalid_frames:
+                if frame_type == "bytes":
+                    websocket.send_bytes(frame)
+                else:
+                    websocket.send_text(frame)
+
+                assert websocket.receive_json()["error"] == "invalid_input"
+
+
+def test_chat_endpoint_enforces_rate_limit(client, authenticated_user):
+    from unittest.mock import patch, AsyncMock
+
+    user, token = authenticated_user
+
+    with patch("src.api.chat.per_message_redis", new_callable=AsyncMock, return_value=(False, None)):
+        with client.websocket_connect(f"/ai/ws/chat?token={token}") as websocket:
+            websocket.send_json({"model_name": AIModels.GROQ.value, "prompt": "Hello"})
+
+            response = websocket.receive_json()
+            assert "exceeded the rate limit" in response["error"]
@@ -28,9 +28,9 @@ def login_data():
 
 
 @pytest.mark.asyncio
-async def test_signup_creates_user_in_database(test_db, signup_data):
+async def test_signup_creates_user_in_database(async_test_db, signup_data):
 
-    user = await auth_repository.signup(signup_data, test_db)
+    user = await auth_repository.signup(signup_data, async_test_db)
 
     assert isinstance(user, User)
     assert user.id is not None
@@ -38,28 +38,28 @@ async def test_signup_creates_user_in_database(test_db, signup_data):
 
 
 @pytest.mark.asyncio
-async def test_signup_hashes_password(test_db, signup_data):
+async def test_signup_hashes_password(async_test_db, signup_data):
 
-    user = await auth_repository.signup(signup_data, test_db)
+    user = await auth_repository.signup(signup_data, async_test_db)
 
     assert user.password != "password123"
     assert len(user.password) > 20
 
 
 @pytest.mark.asyncio
-async def test_signup_raises_error_when_email_exists(test_db, signup_data):
-    await auth_repository.signup(signup_data, test_db)
+async def test_signup_raises_error_when_email_exists(async_test_db, signup_data):
+    await auth_repository.signup(signup_data, async_test_db)
 
     with pytest.raises(HTTPException) as error:
-        await auth_repository.signup(signup_data, test_db)
+        await auth_repository.signup(signup_data, async_test_db)
 
     assert error.value.status_code == 400
     assert error.value.detail == "Email already registered"
 
 
 @pytest.mark.asyncio
-async def test_signup_raises_error_when_username_exists(test_db, signup_data):
-    await auth_repository.signup(signup_data, test_db)
+async def test_signup_raises_error_when_username_exists(async_test_db, signup_data):
+    await auth_repository.signup(signup_data, async_test_db)
 
     with pytest.raises(HTTPException) as error:
         await auth_repository.signup(
@@ -69,17 +69,17 @@ async def test_signup_raises_error_when_username_exists(test_db, signup_data):
                 name="New User",
                 password="password123",
                 recaptcha_token="test-token-no-verification"
-            ), test_db)
+            ), async_test_db)
 
     assert error.value.status_code == 400
     assert error.value.detail == "Username already registered"
 
 
 @pytest.mark.asyncio
-async def test_login_with_email_returns_user_and_token(test_db, signup_data, login_data):
-    await auth_repository.signup(signup_data, test_db)
+async def test_login_with_email_returns_user_and_token(async_test_db, signup_data, login_data):
+    await auth_repository.signup(signup_data, async_test_db)
 
-    user, access_token = await auth_repository.login(login_data, test_db)
+    user, access_token = await auth_repository.login(login_data, async_test_db)
 
     assert user.email == "newuser@example.com"
     assert user.username == "newuser"
@@ -88,9 +88,9 @@ async def test_login_with_email_returns_user_and_token(test_db, signup_data, log
 
 
 @pytest.mark.asyncio
-async def test_login_with_username_returns_user_and_token(test_db, signup_data):
+async def test_login_with_username_returns_user_and_token(async_test_db, signup_data):
 
-    await auth_repository.signup(signup_data, test_db)
+    await auth_repository.signup(signup_data, async_test_db)
 
     login_data = LoginSchema(
         login="newuser",
@@ -98,7 +98,7 @@ async def test_login_with_username_returns_user_and_token(test_db, signup_data):
         recaptcha_token="test-token-no-verification"
     )
 
-    user, access_token = await auth_repository.login(login_data, test_db)
+    user, access_token = await auth_repository.login(login_data, async_test_db)
 
     assert user.username == "newuser"
     assert user.email == "newuser@example.com"
@@ -107,7 +107,7 @@ async def test_login_with_username_returns_user_and_token(test_db, signup_data):
 
 
 @pytest.mark.asyncio
-async def test_login_raises_error_when_user_not_found(test_db):
+async def test_login_raises_error_when_user_not_found(async_test_db):
     login_data = LoginSchema(
         login="newuser",
         password="password123",
@@ -115,16 +115,16 @@ async def test_login_raises_error_when_user_not_found(test_db):
     )
 
     with pytest.raises(HTTPException) as error:
-        await auth_repository.login(login_data, test_db)
+        await auth_repository.login(login_data, async_test_db)
 
     assert error.value.status_code == 404
     assert "User not found" in error.value.detail
 
 
 @pytest.mark.asyncio
-async def test_login_raises_error_when_password_wrong(test_db, signup_data):
+async def test_login_raises_error_when_password_wrong(async_test_db, signup_data):
 
-    await auth_repository.signup(signup_data, test_db)
+    await auth_repository.signup(signup_data, async_test_db)
 
     login_data = LoginSchema(
         login="newuser@example.com",
@@ -133,15 +133,15 @@ async def test_login_raises_error_when_password_wrong(test_db, signup_data):
     )
 
     with pytest.raises(HTTPException) as error:
-        await auth_repository.login(login_data, test_db)
+        await auth_repository.login(login_data, async_test_db)
 
     assert error.value.status_code == 403
     assert "Incorrect password" in error.value.detail
 
 
 @pytest.mark.asyncio
-async def test_login_token_contains_user_email(test_db, signup_data):
-    await auth_repository.signup(signup_data, test_db)
+async def test_login_token_contains_user_email(async_test_db, signup_data):
+    await auth_repository.signup(signup_data, async_test_db)
 
     login_data = LoginSchema(
         login="newuser",
@@ -149,7 +149,7 @@ async def test_login_token_contains_user_email(test_db, signup_data):
         recaptcha_token="test-token-no-verification"
     )
 
-    _, access_token = await auth_repository.login(login_data, test_db)
+    _, access_token = await auth_repository.login(login_data, async_test_db)
 
     decoded = jwt.decode(access_token, options={"verify_signature": False})
     assert decoded["sub"] == "newuser@example.com"
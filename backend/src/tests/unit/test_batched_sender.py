@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from src.core.batched_sender import BatchedSender
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+
+@pytest.mark.asyncio
+async def test_single_payload_is_sent_as_plain_object():
+    websocket = FakeWebSocket()
+    sender = BatchedSender(websocket)
+
+    sender.enqueue({"response": "Hi"})
+    await sender.close()
+
+    assert [json.loads(frame) for frame in websocket.frames] == [{"response": "Hi"}]
+
+
+@pytest.mark.asyncio
+async def test_payloads_queued_in_same_tick_share_one_frame():
+    websocket = FakeWebSocket()
+    sender = BatchedSender(websocket)
+
+    sender.enqueue({"error": "first"})
+    await sender.send_json({"error": "second"})
+    await sender.close()
+
+    assert len(websocket.frames) == 1
+    assert json.loads(websocket.frames[0]) == [{"error": "first"}, {"error": "second"}]
+
+
+@pytest.mark.asyncio
+async def test_frames_are_split_when_max_bytes_exceeded():
+    websocket = FakeWebSocket()
+    sender = BatchedSender(websocket, max_bytes=30)
+
+    for i in range(3):
+        sender.enqueue({"response": f"message {i}"})
+    await sender.close()
+
+    payloads = []
+    for frame in websocket.frames:
+        decoded = json.loads(frame)
+        payloads.extend(decoded if isinstance(decoded, list) else [decoded])
+
+    assert len(websocket.frames) > 1
+    assert all(len(frame) <= 32 for frame in websocket.frames)
+    assert payloads == [{"response": f"message {i}"} for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_close_is_idempotent_and_swallows_send_errors():
+    class ClosedWebSocket:
+        async def send_text(self, text):
+            raise RuntimeError("socket closed")
+
+    sender = BatchedSender(ClosedWebSocket())
+    sender.enqueue({"response": "lost"})
+
+    await sender.close()
+    await sender.close()
+
+
+@pytest.mark.asyncio
+async def test_pre_encoded_payloads_are_sent_as_is():
+    websocket = FakeWebSocket()
+    sender = BatchedSender(websocket)
+
+    sender.enqueue(b'{"error":"precomputed"}')
+    await sender.close()
+
+    assert websocket.frames == ['{"error":"precomputed"}']
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core import cache
+from src.models.user import User
+from src.tests.conftest import FakeRedis, BrokenRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", redis)
+    monkeypatch.setattr(cache, "rate_limit_sha", None)
+    return redis
+
+
+@pytest.fixture
+def db_user(test_db):
+    user = User(
+        email="cached@example.com",
+        username="cacheduser",
+        name="Cached User",
+        password="password123",
+        ai_requests_count=3
+    )
+    test_db.add(user)
+    test_db.commit()
+    test_db.refresh(user)
+    return user
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_warms_cache_on_miss(async_test_db, db_user, fake_redis):
+    user = await cache.get_cached_user(async_test_db, db_user.email)
+
+    assert user.id == db_user.id
+    assert f"{cache.USER_CACHE_PREFIX}{db_user.email}" in fake_redis.store
+    assert "password" not in fake_redis.store[f"{cache.USER_CACHE_PREFIX}{db_user.email}"]
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_skips_database_on_hit(async_test_db, db_user, fake_redis, monkeypatch):
+    await cache.cache_user(db_user)
+    mock_lookup = AsyncMock()
+    monkeypatch.setattr(cache, "get_user_from_token", mock_lookup)
+
+    user = await cache.get_cached_user(async_test_db, db_user.email)
+
+    mock_lookup.assert_not_awaited()
+    assert user.id == db_user.id
+    assert user.ai_requests_count == 3
+    assert user.is_unlimited is False
+
+
+@pytest.mark.asyncio
+async def test_cached_user_can_be_updated(async_test_db, test_db, db_user, fake_redis):
+    await cache.cache_user(db_user)
+
+    user = await cache.get_cached_user(async_test_db, db_user.email)
+    user.ai_requests_count += 1
+    await async_test_db.commit()
+
+    test_db.refresh(db_user)
+    assert db_user.ai_requests_count == 4
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_falls_back_to_database_when_redis_fails(async_test_db, db_user, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", BrokenRedis())
+
+    user = await cache.get_cached_user(async_test_db, db_user.email)
+
+    assert user.id == db_user.id
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_returns_none_for_unknown_email(async_test_db, fake_redis):
+    user = await cache.get_cached_user(async_test_db, "nobody@example.com")
+
+    assert user is None
+    assert fake_redis.store == {}
+
+
+@pytest.mark.asyncio
+async def test_per_message_redis_limits_requests_and_returns_cached_user(db_user, fake_redis, monkeypatch):
+    monkeypatch.setattr(cache, "RATE_LIMIT_TIMES", 2)
+    await cache.cache_user(db_user)
+
+    results = [await cache.per_message_redis(db_user.id, db_user.email) for _ in range(3)]
+
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert results[0][1] == fake_redis.store[f"{cache.USER_CACHE_PREFIX}{db_user.email}"]
+
+
+@pytest.mark.asyncio
+async def test_per_message_redis_reloads_script_after_redis_flush(db_user, fake_redis, monkeypatch):
+    monkeypatch.setattr(cache, "rate_limit_sha", "stale-sha")
+
+    allowed, _ = await cache.per_message_redis(db_user.id, db_user.email)
+
+    assert allowed is True
+    assert cache.rate_limit_sha == "rate-limit-sha"
+    assert fake_redis.store[f"{cache.RATE_LIMIT_PREFIX}{db_user.id}"] == 1
+
+
+@pytest.mark.asyncio
+async def test_per_message_redis_fails_open_when_redis_fails(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", BrokenRedis())
+
+    assert await cache.per_message_redis(1, "user@example.com") == (True, None)
@@ -1,6 +1,7 @@
 from fastapi import HTTPException
+import orjson
 import pytest
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import patch, AsyncMock
 
 from src.models.chat_history import ChatHistory
 from src.core.enums import AIModels
@@ -23,16 +24,16 @@ def websocket_message():
 
 
 @pytest.mark.asyncio
-async def test_generate_model_response_saves_to_database(test_db, chat_user, websocket_message):
+async def test_generate_model_response_saves_to_database(async_test_db, chat_user, websocket_message):
     # Initialize user fields
     chat_user.ai_requests_count = 0
     chat_user.is_unlimited = False
-    test_db.add(chat_user)
-    test_db.commit()
-    test_db.refresh(chat_user)
+    async_test_db.add(chat_user)
+    await async_test_db.commit()
+    await async_test_db.refresh(chat_user)
     
     with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-        mock_ai = Mock()
+        mock_ai = AsyncMock()
         mock_ai.chat.return_value = "Hello! How can I help you?"
         mock_platform.return_value = mock_ai
 
@@ -41,11 +42,13 @@ async def test_generate_model_response_saves_to_database(test_db, chat_user, web
         chat_record, remaining = await chat_repository.generate_model_response(
             websocket_message, 
             chat_user, 
-            test_db,
+            async_test_db,
             websocket
         )
         
         assert isinstance(chat_record, ChatHistory)
+        assert chat_record.id is not None
+        assert chat_record.created_at is not None
         assert chat_record.prompt == "Hello, AI!"
         assert chat_record.response == "Hello! How can I help you?"
         assert chat_record.model_name == AIModels.GROQ
@@ -55,12 +58,12 @@ async def test_generate_model_response_saves_to_database(test_db, chat_user, web
 
 
 @pytest.mark.asyncio
-async def test_generate_model_response_calls_correct_ai_platform(test_db, chat_user):
+async def test_generate_model_response_calls_correct_ai_platform(async_test_db, chat_user):
     chat_user.ai_requests_count = 0
     chat_user.is_unlimited = False
-    test_db.add(chat_user)
-    test_db.commit()
-    test_db.refresh(chat_user)
+    async_test_db.add(chat_user)
+    await async_test_db.commit()
+    await async_test_db.refresh(chat_user)
     
     groq_message = WebSocketMessage(
         prompt="Test Prompt",
@@ -69,7 +72,7 @@ async def test_generate_model_response_calls_correct_ai_platform(test_db, chat_u
 
 
     with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-        mock_ai = Mock()
+        mock_ai = AsyncMock()
         mock_ai.chat.return_value = "Response"
         mock_platform.return_value = mock_ai
 
@@ -78,7 +81,7 @@ async def test_generate_model_response_calls_correct_ai_platform(test_db, chat_u
         await chat_repository.generate_model_response(
             groq_message, 
             chat_user, 
-            test_db,
+            async_test_db,
             websocket
         )
 
@@ -86,16 +89,16 @@ async def test_generate_model_response_calls_correct_ai_platform(test_db, chat_u
 
 
 @pytest.mark.asyncio
-async def test_generate_model_response_raises_error_when_ai_fails(test_db, chat_user, websocket_message):
+async def test_generate_model_response_raises_error_when_ai_fails(async_test_db, chat_user, websocket_message):
     chat_user.ai_requests_count = 0
     chat_user.is_unlimited = False
-    test_db.add(chat_user)
-    test_db.commit()
-    test_db.refresh(chat_user)
+    async_test_db.add(chat_user)
+    await async_test_db.commit()
+    await async_test_db.refresh(chat_user)
     
 
     with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-        mock_ai = Mock()
+        mock_ai = AsyncMock()
         mock_ai.chat.side_effect = Exception("API key invalid")
         mock_platform.return_value = mock_ai
 
@@ -104,7 +107,7 @@ async def test_generate_model_response_raises_error_when_ai_fails(test_db, chat_
         chat_record, remaining = await chat_repository.generate_model_response(
             websocket_message, 
             chat_user, 
-            test_db,
+            async_test_db,
             websocket
         )
         
@@ -117,7 +120,8 @@ async def test_generate_model_response_raises_error_when_ai_fails(test_db, chat_
         })
 
 
-def test_get_chat_history_returns_user_chats(test_db, chat_user):
+@pytest.mark.asyncio
+async def test_get_chat_history_returns_user_chats(async_test_db, chat_user):
     chat1 = ChatHistory(
         user_id=chat_user.id,
         prompt="First prompt",
@@ -131,18 +135,35 @@ def test_get_chat_history_returns_user_chats(test_db, chat_user):
         model_name=AIModels.GROQ
     )
 
-    test_db.add(chat1)
-    test_db.add(chat2)
-    test_db.commit()
+    async_test_db.add(chat1)
+    async_test_db.add(chat2)
+    await async_test_db.commit()
 
-    result = chat_repository.get_chat_history(AIModels.GROQ, chat_user, test_db)
+    result = await chat_repository.get_chat_history(AIModels.GROQ, chat_user, async_test_db)
 
     assert len(result) == 2
     assert result[0].prompt == "First prompt"
     assert result[1].prompt == "Second prompt"
 
 
-def test_get_chat_history_filters_by_model_name(test_db, chat_user):
+@pytest.mark.asyncio
+async def test_get_chat_history_keeps_most_recent_within_limit(async_test_db, chat_user):
+    for i in range(5):
+        async_test_db.add(ChatHistory(
+            user_id=chat_user.id,
+            prompt=f"Prompt {i}",
+            response=f"Response {i}",
+            model_name=AIModels.GROQ
+        ))
+    await async_test_db.commit()
+
+    result = await chat_repository.get_chat_history(AIModels.GROQ, chat_user, async_test_db, limit=3)
+
+    assert [chat.prompt for chat in result] == ["Prompt 2", "Prompt 3", "Prompt 4"]
+
+
+@pytest.mark.asyncio
+async def test_get_chat_history_filters_by_model_name(async_test_db, chat_user):
     """Test that get_chat_history only returns chats for specified model"""
     
     groq_chat = ChatHistory(
@@ -152,23 +173,25 @@ def test_get_chat_history_filters_by_model_name(test_db, chat_user):
         model_name=AIModels.GROQ
     )
     
-    test_db.add(groq_chat)
-    test_db.commit()
+    async_test_db.add(groq_chat)
+    await async_test_db.commit()
     
-    result = chat_repository.get_chat_history(AIModels.GROQ, chat_user, test_db)
+    result = await chat_repository.get_chat_history(AIModels.GROQ, chat_user, async_test_db)
     
     assert len(result) == 1
     assert result[0].model_name == AIModels.GROQ
 
 
-def test_get_chat_history_returns_empty_for_no_chats(test_db, chat_user):
+@pytest.mark.asyncio
+async def test_get_chat_history_returns_empty_for_no_chats(async_test_db, chat_user):
     
-    result = chat_repository.get_chat_history(AIModels.GROQ, chat_user, test_db)
+    result = await chat_repository.get_chat_history(AIModels.GROQ, chat_user, async_test_db)
     
     assert result == []
 
 
-def test_get_chat_history_only_returns_current_user_chats(test_db, chat_user):
+@pytest.mark.asyncio
+async def test_get_chat_history_only_returns_current_user_chats(async_test_db, chat_user):
     from src.models.user import User
     
     other_user = User(
@@ -178,8 +201,8 @@ def test_get_chat_history_only_returns_current_user_chats(test_db, chat_user):
         name="Other User",
         password="password123"
     )
-    test_db.add(other_user)
-    test_db.commit()
+    async_test_db.add(other_user)
+    await async_test_db.commit()
     
     other_chat = ChatHistory(
         user_id=other_user.id,
@@ -187,10 +210,10 @@ def test_get_chat_history_only_returns_current_user_chats(test_db, chat_user):
         response="Other user response",
         model_name=AIModels.GROQ  
     )
-    test_db.add(other_chat)
-    test_db.commit()
+    async_test_db.add(other_chat)
+    await async_test_db.commit()
     
-    result = chat_repository.get_chat_history(AIModels.GROQ, chat_user, test_db)
+    result = await chat_repository.get_chat_history(AIModels.GROQ, chat_user, async_test_db)
     
     assert len(result) == 0
 
@@ -198,7 +221,7 @@ def test_get_chat_history_only_returns_current_user_chats(test_db, chat_user):
 def test_check_usage_limit_allows_when_under_limit(test_db, chat_user, monkeypatch):
     """Test that check_usage_limit allows requests when under limit"""
     mocked_limit = 10
-    monkeypatch.setattr("src.core.config.settings.AI_USAGE_LIMIT", mocked_limit)
+    monkeypatch.setattr("src.repositories.chat_repository.AI_USAGE_LIMIT", mocked_limit)
 
     chat_user.ai_requests_count = 5
     chat_user.is_unlimited = False
@@ -213,7 +236,7 @@ def test_check_usage_limit_allows_when_under_limit(test_db, chat_user, monkeypat
 def test_check_usage_limit_rejects_when_limit_reached(test_db, chat_user, monkeypatch):
     """Test that check_usage_limit rejects when limit is reached"""
     mocked_limit = 10
-    monkeypatch.setattr("src.core.config.settings.AI_USAGE_LIMIT", mocked_limit)
+    monkeypatch.setattr("src.repositories.chat_repository.AI_USAGE_LIMIT", mocked_limit)
 
     chat_user.ai_requests_count = mocked_limit
     chat_user.is_unlimited = False
@@ -236,19 +259,19 @@ def test_check_usage_limit_allows_unlimited_users(test_db, chat_user):
 
 
 @pytest.mark.asyncio
-async def test_generate_model_response_increments_counter(test_db, chat_user, websocket_message):
+async def test_generate_model_response_increments_counter(async_test_db, chat_user, websocket_message):
     """Test that ai_requests_count is incremented after successful AI response"""
     chat_user.ai_requests_count = 3
     chat_user.is_unlimited = False
-    test_db.add(chat_user)
-    test_db.commit()
-    test_db.refresh(chat_user)
+    async_test_db.add(chat_user)
+    await async_test_db.commit()
+    await async_test_db.refresh(chat_user)
     
     initial_count = chat_user.ai_requests_count
 
 
     with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-        mock_ai = Mock()
+        mock_ai = AsyncMock()
         mock_ai.chat.return_value = "Response"
         mock_platform.return_value = mock_ai
 
@@ -257,50 +280,51 @@ async def test_generate_model_response_increments_counter(test_db, chat_user, we
         await chat_repository.generate_model_response(
             websocket_message, 
             chat_user, 
-            test_db,
+            async_test_db,
             websocket
         )
         
-        test_db.refresh(chat_user)
+        await async_test_db.refresh(chat_user)
         assert chat_user.ai_requests_count == initial_count + 1
 
 
 @pytest.mark.asyncio
-async def test_generate_model_response_rejects_when_limit_reached(test_db, chat_user, websocket_message):
+async def test_generate_model_response_rejects_when_limit_reached(async_test_db, chat_user, websocket_message):
     """Test that generate_model_response rejects when usage limit is reached"""
     chat_user.ai_requests_count = 10
     chat_user.is_unlimited = False
-    test_db.add(chat_user)
-    test_db.commit()
-    test_db.refresh(chat_user)
+    async_test_db.add(chat_user)
+    await async_test_db.commit()
+    await async_test_db.refresh(chat_user)
     
     websocket = AsyncMock()
 
     chat_record, remaining = await chat_repository.generate_model_response(
         websocket_message, 
         chat_user, 
-        test_db,
+        async_test_db,
         websocket
     )
 
     assert chat_record is None
     assert remaining is None
-    websocket.send_json.assert_called_once_with({
+    websocket.send_json.assert_called_once_with(chat_repository.USAGE_LIMIT_ERROR)
+    assert orjson.loads(chat_repository.USAGE_LIMIT_ERROR) == {
         "error": "AI usage limit reached. You have used all 10 free messages."
-    })
+    }
 
 
 @pytest.mark.asyncio
-async def test_generate_model_response_allows_unlimited_users(test_db, chat_user, websocket_message):
+async def test_generate_model_response_allows_unlimited_users(async_test_db, chat_user, websocket_message):
     """Test that unlimited users can exceed the normal limit"""
     chat_user.ai_requests_count = 50  # Way over normal limit
     chat_user.is_unlimited = True
-    test_db.add(chat_user)
-    test_db.commit()
-    test_db.refresh(chat_user)
+    async_test_db.add(chat_user)
+    await async_test_db.commit()
+    await async_test_db.refresh(chat_user)
     
     with patch('src.repositories.chat_repository.get_ai_platform') as mock_platform:
-        mock_ai = Mock()
+        mock_ai = AsyncMock()
         mock_ai.chat.return_value = "Response"
         mock_platform.return_value = mock_ai
 
@@ -309,12 +333,12 @@ async def test_generate_model_response_allows_unlimited_users(test_db, chat_user
         chat_record, remaining = await chat_repository.generate_model_response(
             websocket_message, 
             chat_user, 
-            test_db,
+            async_test_db,
             websocket
         )
         
         assert chat_record is not None
         assert remaining == -1  # Unlimited
         # Counter should not increment for unlimited users
-        test_db.refresh(chat_user)
+        await async_test_db.refresh(chat_user)
         assert chat_user.ai_requests_count == 50
@@ -0,0 +1,12 @@
+import pytest
+
+from src.core.enums import AIModels, PROVIDER_AVAILABILITY, is_provider_available
+
+
+@pytest.mark.parametrize("model_name", list(AIModels))
+def test_is_provider_available_matches_availability_map(model_name):
+    assert is_provider_available(model_name) is PROVIDER_AVAILABILITY.get(model_name, False)
+
+
+def test_is_provider_available_accepts_raw_values():
+    assert is_provider_available(AIModels.GROQ.value) is PROVIDER_AVAILABILITY[AIModels.GROQ]
@@ -18,3 +18,10 @@ def test_hash_password(plain_password):
 def test_verify_password(plain_password):
     hashed_password = password_hash.hash(plain_password)
     assert verify_password(plain_password, hashed_password) is True
+
+
+def test_hash_password_uses_tuned_argon2id():
+    hashed = hash_password("password")
+    assert hashed.startswith("$argon2id$")
+    assert "m=65536,t=2,p=1" in hashed
+
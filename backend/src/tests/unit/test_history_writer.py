@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from sqlmodel import select
+
+from src.core import history_writer
+from src.core.enums import AIModels
+from src.core.history_writer import ChatHistoryWriter
+from src.models.chat_history import ChatHistory
+from src.models.user import User
+
+
+@pytest.fixture
+def db_user(test_db):
+    user = User(
+        email="writer@example.com",
+        username="writeruser",
+        name="Writer User",
+        password="password123",
+        ai_requests_count=2
+    )
+    test_db.add(user)
+    test_db.commit()
+    test_db.refresh(user)
+    return user
+
+
+def make_chat(user, prompt):
+    return ChatHistory(user_id=user.id, prompt=prompt, response="Response", model_name=AIModels.GROQ)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_share_one_batch(test_db, db_user, monkeypatch):
+    batches = []
+    write_batch = history_writer.write_batch
+
+    async def recording_write_batch(entries):
+        batches.append(len(entries))
+        await write_batch(entries)
+
+    monkeypatch.setattr(history_writer, "write_batch", recording_write_batch)
+    writer = ChatHistoryWriter()
+
+    chats = await asyncio.gather(*(
+        writer.save(make_chat(db_user, f"Prompt {i}"), count_request=True) for i in range(3)))
+    await writer.close()
+
+    assert batches == [3]
+    assert all(chat.id is not None for chat in chats)
+    test_db.refresh(db_user)
+    assert db_user.ai_requests_count == 5
+    assert len(test_db.exec(select(ChatHistory)).all()) == 3
+
+
+@pytest.mark.asyncio
+async def test_uncounted_rows_do_not_increment_requests(test_db, db_user):
+    chat = await history_writer.save_chat(make_chat(db_user, "Unlimited"), count_request=False)
+
+    assert chat.id is not None
+    test_db.refresh(db_user)
+    assert db_user.ai_requests_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller(test_db, db_user, monkeypatch):
+    async def failing_write_batch(entries):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(history_writer, "write_batch", failing_write_batch)
+    writer = ChatHistoryWriter()
+
+    results = await asyncio.gather(*(
+        writer.save(make_chat(db_user, f"Prompt {i}"), count_request=True) for i in range(2)),
+        return_exceptions=True)
+    await writer.close()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -9,54 +9,58 @@ from src.core.oauth2 import get_current_user, authenticate_websocket
 
 
 
-def test_get_current_user_returns_user_when_valid(mocker, sample_user):
+@pytest.mark.asyncio
+async def test_get_current_user_returns_user_when_valid(mocker, sample_user):
 
     token = create_access_token({"sub": "test@example.com"})
 
-    fake_db = mocker.Mock()
+    fake_db = mocker.AsyncMock()
     fake_db.scalar.return_value = sample_user
 
-    result = get_current_user(token, fake_db)
+    result = await get_current_user(token, fake_db)
 
     assert isinstance(result, User)
     assert result.email == sample_user.email
-    fake_db.scalar.assert_called_once()
+    fake_db.scalar.assert_awaited_once()
 
 
-def test_get_current_user_raises_error_when_user_not_found(mocker):
+@pytest.mark.asyncio
+async def test_get_current_user_raises_error_when_user_not_found(mocker):
     token = create_access_token({"sub": "test@example.com"})
 
-    fake_db = mocker.Mock()
+    fake_db = mocker.AsyncMock()
     fake_db.scalar.return_value = None
 
     with pytest.raises(HTTPException) as error:
-        get_current_user(token, fake_db)
+        await get_current_user(token, fake_db)
 
     assert error.value.status_code == 401
     assert error.value.detail == "Could not validate credentials"
 
 
-def test_get_current_user_raises_error_when_token_invalid(mocker):    
+@pytest.mark.asyncio
+async def test_get_current_user_raises_error_when_token_invalid(mocker):    
     invalid_token = "this.is.an.invalid.token"
 
-    fake_db = mocker.Mock()
+    fake_db = mocker.AsyncMock()
     with pytest.raises(HTTPException) as error:
-        get_current_user(invalid_token, fake_db)
+        await get_current_user(invalid_token, fake_db)
 
     assert error.value.status_code == 401
     assert error.value.detail == "Could not validate credentials"
 
 
-def test_get_current_user_raises_error_when_token_expired(mocker):
+@pytest.mark.asyncio
+async def test_get_current_user_raises_error_when_token_expired(mocker):
     from datetime import timedelta
     expired_token = create_access_token(
         {'sub': 'test@example.com'},
         expires_delta=timedelta(seconds=-1)
     )
 
-    fake_db = mocker.Mock()
+    fake_db = mocker.AsyncMock()
     with pytest.raises(HTTPException) as error:
-        get_current_user(expired_token, fake_db)
+        await get_current_user(expired_token, fake_db)
 
     assert error.value.status_code == 401
     assert error.value.detail == "Token has expired"
@@ -0,0 +1,89 @@
+from dataclasses import replace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src.core import cache, recaptcha
+from src.core.config import settings
+from src.tests.conftest import FakeRedis, BrokenRedis
+
+
+@pytest.fixture
+def google_response(monkeypatch):
+    """Route the shared client through a mock transport returning the given JSON/status."""
+    # settings is frozen, so swap in a copy with TESTING off
+    monkeypatch.setattr(recaptcha, "settings", replace(settings, TESTING=False))
+    calls = []
+
+    def install(json_body=None, status_code=200):
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(status_code, json=json_body or {})
+
+        monkeypatch.setattr(recaptcha, "http_client", httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)))
+        return calls
+
+    return install
+
+
+@pytest.mark.asyncio
+async def test_verify_recaptcha_token_returns_true_on_success(google_response):
+    calls = google_response({"success": True})
+
+    assert await recaptcha.verify_recaptcha_token("valid-token") is True
+    assert len(calls) == 1
+    assert b"response=valid-token" in calls[0].content
+
+
+@pytest.mark.asyncio
+async def test_verify_recaptcha_token_rejects_failed_verification(google_response):
+    google_response({"success": False})
+
+    with pytest.raises(HTTPException) as error:
+        await recaptcha.verify_recaptcha_token("bad-token")
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_verify_recaptcha_token_raises_500_on_http_error(google_response):
+    google_response(status_code=503)
+
+    with pytest.raises(HTTPException) as error:
+        await recaptcha.verify_recaptcha_token("valid-token")
+
+    assert error.value.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_verify_recaptcha_token_memoizes_success(google_response, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", FakeRedis())
+    calls = google_response({"success": True})
+
+    assert await recaptcha.verify_recaptcha_token("valid-token") is True
+    assert await recaptcha.verify_recaptcha_token("valid-token") is True
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_verify_recaptcha_token_does_not_memoize_failure(google_response, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", FakeRedis())
+    calls = google_response({"success": False})
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await recaptcha.verify_recaptcha_token("bad-token")
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_recaptcha_token_verifies_live_when_redis_fails(google_response, monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", BrokenRedis())
+    calls = google_response({"success": True})
+
+    assert await recaptcha.verify_recaptcha_token("valid-token") is True
+    assert len(calls) == 1
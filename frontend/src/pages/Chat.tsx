@@ -131,9 +131,7 @@ const Chat = () => {
 
     ws.onopen = () => console.log("WebSocket connected");
 
-    ws.onmessage = (event) => {
-      const data: WebSocketMessage = JSON.parse(event.data);
-
+    const handleMessage = (data: WebSocketMessage) => {
       if (data.error) {
         toast.error(data.error);
 
@@ -164,6 +162,12 @@ const Chat = () => {
       bcRef.current?.postMessage(aiMessage);
     };
 
+    ws.onmessage = (event) => {
+      // The server batches payloads queued in the same tick into one JSON array frame
+      const frame: WebSocketMessage | WebSocketMessage[] = JSON.parse(event.data);
+      (Array.isArray(frame) ? frame : [frame]).forEach(handleMessage);
+    };
+
     ws.onclose = () => {
       console.log("WebSocket disconnected");
       setWaiting(false); // <-- FIX